@@ -1,8 +1,13 @@
 import os
 import json
+import hashlib
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Optional
 
 # === Configuration ===
 TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
@@ -10,6 +15,7 @@ TELEGRAM_CHANNEL_ID = os.environ.get("TELEGRAM_CHANNEL_ID")
 CONFIG_FILE = "config.json"
 CACHE_FILE = "last_schedules.json"
 MESSAGES_FILE = "message_ids.json"
+HTTP_CACHE_FILE = "http_cache.json"
 
 # Kyiv timezone UTC+2
 KYIV_TZ = timezone(timedelta(hours=2))
@@ -18,25 +24,46 @@ KYIV_TZ = timezone(timedelta(hours=2))
 GITHUB_DATA_URL = "https://raw.githubusercontent.com/Baskerville42/outage-data-ua/main/data/{region}.json"
 YASNO_API_URL = "https://app.yasno.ua/api/blackout-service/public/shutdowns/regions/{region_id}/dsos/{dso_id}/planned-outages"
 
-# Days of week (Ukrainian)
-DAYS_UA = {
-    0: "Понеділок",
-    1: "Вівторок",
-    2: "Середа",
-    3: "Четвер",
-    4: "П'ятниця",
-    5: "Субота",
-    6: "Неділя"
+# Days of week (Ukrainian), indexed by weekday()
+DAYS_UA = (
+    "Понеділок",
+    "Вівторок",
+    "Середа",
+    "Четвер",
+    "П'ятниця",
+    "Субота",
+    "Неділя"
+)
+
+# GitHub hour keys ("1".."24") and their (first half, second half) power state
+HOUR_KEYS = tuple(str(hour) for hour in range(1, 25))
+POWER_ON_HOUR = (True, True)
+STATUS_HALVES = {
+    "yes": POWER_ON_HOUR,
+    "no": (False, False),
+    "first": (False, True),
+    "second": (True, False),
+    # maybe, mfirst, msecond and unknown statuses count as power on
 }
 
 # Separators
 SEP_SOURCE = "✧ ✧ ✧"
 SEP_DAY = "■  ■  ■"
 
+# Period markers indexed by is_on: (off, on)
+PERIOD_EMOJI = ("🟠", "🟢")
+
 SOURCE_GITHUB = "GitHub-ДТЕК"
 SOURCE_YASNO = "yasno"
 MAX_MESSAGES = 1
 
+# Shared HTTP session: keeps connections to GitHub/Yasno/Telegram alive
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Returned by fetchers when the server answers 304 Not Modified
+NOT_MODIFIED = object()
+
 
 def load_config() -> dict:
     """Load configuration from file"""
@@ -57,20 +84,16 @@ def get_kyiv_now() -> datetime:
     return datetime.now(KYIV_TZ)
 
 
-def format_hours(hours: float) -> str:
-    """Format hours with proper Ukrainian declension"""
-    if hours == int(hours):
-        hours = int(hours)
-    
-    if isinstance(hours, float):
-        return f"<b>{hours}</b> год"
-    
-    if hours % 10 == 1 and hours % 100 != 11:
-        return f"<b>{hours}</b> год"
-    elif hours % 10 in [2, 3, 4] and hours % 100 not in [12, 13, 14]:
-        return f"<b>{hours}</b> год"
-    else:
-        return f"<b>{hours}</b> год"
+def format_hours_from_slots(slot_count: int) -> str:
+    """Format duration given in half-hour slots as hours"""
+    hours, half = divmod(slot_count, 2)
+    if half:
+        return f"<b>{hours}.5</b> год"
+    return f"<b>{hours}</b> год"
+
+
+# Formatted durations indexed by number of half-hour slots (0-48)
+HOURS_STR = tuple(format_hours_from_slots(count) for count in range(49))
 
 
 def format_time(minutes: int) -> str:
@@ -82,77 +105,108 @@ def format_time(minutes: int) -> str:
     return f"{hours:02d}:{mins:02d}"
 
 
+# Time strings for every slot boundary (0-48)
+SLOT_TIMES = tuple(format_time(slot * 30) for slot in range(49))
+
+
 def format_slot_time(slot: int) -> str:
     """Convert slot index (0-48) to time string"""
-    return format_time(slot * 30)
+    return SLOT_TIMES[slot]
 
 
 # === Data fetching ===
 
-def fetch_github_data(region: str) -> Optional[dict]:
-    """Fetch data from GitHub repository"""
+def conditional_headers(validators: dict, url: str) -> dict:
+    """Build conditional request headers from cached ETag/Last-Modified"""
+    headers: dict[str, str] = {}
+    # Validators saved for another URL (e.g. region changed in config) don't apply
+    if validators.get("url") != url:
+        validators.clear()
+        return headers
+    
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def update_validators(validators: dict, url: str, response: requests.Response):
+    """Remember URL and ETag/Last-Modified of a fresh response"""
+    validators.clear()
+    validators["url"] = url
+    if response.headers.get("ETag"):
+        validators["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        validators["last_modified"] = response.headers["Last-Modified"]
+
+
+def fetch_github_data(region: str, validators: dict) -> Any:
+    """Fetch data from GitHub repository (NOT_MODIFIED if unchanged)"""
     try:
         url = GITHUB_DATA_URL.format(region=region)
-        response = requests.get(url, timeout=30)
+        headers = conditional_headers(validators, url)
+        response = SESSION.get(url, headers=headers, timeout=30)
+        if response.status_code == 304:
+            return NOT_MODIFIED
         response.raise_for_status()
-        return response.json()
+        update_validators(validators, url, response)
+        return orjson.loads(response.content)
     except Exception as e:
+        validators.clear()
         print(f"GitHub fetch error: {e}")
         return None
 
 
-def fetch_yasno_data(region_id: str, dso_id: str) -> Optional[dict]:
-    """Fetch data from Yasno API"""
+def fetch_yasno_data(region_id: str, dso_id: str, validators: dict) -> Any:
+    """Fetch data from Yasno API (NOT_MODIFIED if unchanged)"""
     try:
         url = YASNO_API_URL.format(region_id=region_id, dso_id=dso_id)
         headers = {
             "User-Agent": "Mozilla/5.0",
-            "Accept": "application/json"
+            "Accept": "application/json",
+            **conditional_headers(validators, url)
         }
-        response = requests.get(url, headers=headers, timeout=30)
+        response = SESSION.get(url, headers=headers, timeout=30)
+        if response.status_code == 304:
+            return NOT_MODIFIED
         response.raise_for_status()
-        return response.json()
+        update_validators(validators, url, response)
+        return orjson.loads(response.content)
     except Exception as e:
+        validators.clear()
         print(f"Yasno API fetch error: {e}")
         return None
 
 
-# === GitHub data parsing ===
+def fetch_status(data: Any) -> str:
+    """Describe fetch result for logging"""
+    if data is NOT_MODIFIED:
+        return "NOT MODIFIED"
+    return "OK" if data else "FAILED"
 
-def is_all_yes(day_data: dict) -> bool:
-    """Check if all hours have 'yes' status (schedule pending)"""
-    for hour in range(1, 25):
-        if day_data.get(str(hour), "yes") != "yes":
-            return False
-    return True
 
+# === GitHub data parsing ===
 
-def parse_github_day(day_data: dict) -> list[bool]:
-    """Parse GitHub day data into 48 half-hour slots (True = power on)"""
-    slots = []
+def parse_github_day(day_data: dict[str, str]) -> Optional[list[bool]]:
+    """Parse GitHub day data into 48 half-hour slots (True = power on).
+    Returns None if all hours have 'yes' status (schedule pending)"""
+    slots: list[bool] = []
+    all_yes = True
     
-    for hour in range(1, 25):
-        status = day_data.get(str(hour), "yes")
+    for hour_key in HOUR_KEYS:
+        status = day_data.get(hour_key, "yes")
+        if status != "yes":
+            all_yes = False
         
-        if status == "yes":
-            first_half, second_half = True, True
-        elif status == "no":
-            first_half, second_half = False, False
-        elif status == "first":
-            first_half, second_half = False, True
-        elif status == "second":
-            first_half, second_half = True, False
-        else:  # maybe, mfirst, msecond
-            first_half, second_half = True, True
-        
-        slots.extend([first_half, second_half])
+        slots.extend(STATUS_HALVES.get(status, POWER_ON_HOUR))
     
-    return slots
+    return None if all_yes else slots
 
 
 def extract_github_schedules(data: dict, groups: list[str]) -> dict:
     """Extract schedules from GitHub data"""
-    result = {}
+    result: dict[str, dict] = {}
     fact_data = data.get("fact", {}).get("data", {})
     
     if not fact_data:
@@ -169,16 +223,16 @@ def extract_github_schedules(data: dict, groups: list[str]) -> dict:
                 continue
             
             date = datetime.fromtimestamp(int(day_ts), tz=KYIV_TZ)
-            date_str = date.strftime("%Y-%m-%d")
+            date_str = date.date().isoformat()
             
-            if is_all_yes(day_data):
+            slots = parse_github_day(day_data)
+            if slots is None:
                 result[group][date_str] = {
                     "slots": None,
                     "date": date,
                     "status": "pending"
                 }
             else:
-                slots = parse_github_day(day_data)
                 result[group][date_str] = {
                     "slots": slots,
                     "date": date,
@@ -215,13 +269,13 @@ def parse_yasno_day(day_data: dict) -> tuple[Optional[list[bool]], str]:
 
 def extract_yasno_schedules(data: dict, groups: list[str]) -> dict:
     """Extract schedules from Yasno API data"""
-    result = {}
+    result: dict[str, dict] = {}
     
     if not data:
         return result
     
     for group in groups:
-        group_key = group.replace("GPV", "")
+        group_key = group.removeprefix("GPV")
         
         if group_key not in data:
             continue
@@ -236,7 +290,7 @@ def extract_yasno_schedules(data: dict, groups: list[str]) -> dict:
             
             date_str_full = day_data["date"]
             date = datetime.fromisoformat(date_str_full)
-            date_str = date.strftime("%Y-%m-%d")
+            date_str = date.date().isoformat()
             
             slots, status = parse_yasno_day(day_data)
             result[group][date_str] = {
@@ -250,39 +304,43 @@ def extract_yasno_schedules(data: dict, groups: list[str]) -> dict:
 
 # === Schedule processing ===
 
-def slots_to_periods(slots: list[bool]) -> list[dict]:
+def slots_to_periods(slots: Optional[list[bool]]) -> list[dict[str, Any]]:
     """Convert slot array to list of periods"""
     if not slots:
         return []
     
-    periods = []
+    return build_periods(tuple(slots))
+
+
+@lru_cache(maxsize=None)
+def build_periods(slots: tuple[bool, ...]) -> list[dict[str, Any]]:
+    """Build periods for slots (memoized - the result is shared, don't modify it)"""
+    periods: list[dict[str, Any]] = []
     current_status = slots[0]
     start_slot = 0
     
     for i in range(1, len(slots)):
         if slots[i] != current_status:
-            hours = (i - start_slot) * 0.5
             periods.append({
-                "start": format_slot_time(start_slot),
-                "end": format_slot_time(i),
+                "start": SLOT_TIMES[start_slot],
+                "end": SLOT_TIMES[i],
                 "is_on": current_status,
-                "hours": hours
+                "slot_count": i - start_slot
             })
             current_status = slots[i]
             start_slot = i
     
-    hours = (len(slots) - start_slot) * 0.5
     periods.append({
-        "start": format_slot_time(start_slot),
-        "end": format_slot_time(len(slots)),
+        "start": SLOT_TIMES[start_slot],
+        "end": SLOT_TIMES[len(slots)],
         "is_on": current_status,
-        "hours": hours
+        "slot_count": len(slots) - start_slot
     })
     
     return periods
 
 
-def schedules_match(slots1: list[bool], slots2: list[bool]) -> bool:
+def schedules_match(slots1: Optional[list[bool]], slots2: Optional[list[bool]]) -> bool:
     """Check if two schedules are identical"""
     if not slots1 or not slots2:
         return False
@@ -293,7 +351,7 @@ def schedules_match(slots1: list[bool], slots2: list[bool]) -> bool:
 
 def schedules_to_cache_format(github_schedules: dict, yasno_schedules: dict) -> dict:
     """Convert schedules to serializable cache format"""
-    cache = {"github": {}, "yasno": {}}
+    cache: dict[str, dict] = {"github": {}, "yasno": {}}
     
     for group, dates in github_schedules.items():
         cache["github"][group] = {}
@@ -314,6 +372,19 @@ def schedules_to_cache_format(github_schedules: dict, yasno_schedules: dict) ->
     return cache
 
 
+def write_json_atomic(path: str, data, **kwargs):
+    """Write JSON to a temp file, then move it into place"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def cache_fingerprint(cache: dict) -> str:
+    """Stable hash of schedules cache contents"""
+    return hashlib.sha1(json.dumps(cache, sort_keys=True).encode()).hexdigest()
+
+
 def load_cached_schedules() -> dict:
     """Load cached schedules from file"""
     try:
@@ -325,8 +396,50 @@ def load_cached_schedules() -> dict:
 
 def save_cached_schedules(cache: dict):
     """Save schedules cache to file"""
-    with open(CACHE_FILE, "w") as f:
-        json.dump(cache, f, indent=2)
+    write_json_atomic(CACHE_FILE, cache, indent=2)
+
+
+def schedules_from_cache(cached: dict) -> dict:
+    """Rebuild schedules of an unchanged source from cache"""
+    result: dict[str, dict] = {}
+    
+    for group, dates in cached.items():
+        result[group] = {}
+        for date_str, data in dates.items():
+            date = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=KYIV_TZ)
+            result[group][date_str] = {
+                "slots": data["slots"],
+                "date": date,
+                "status": data["status"]
+            }
+    
+    return result
+
+
+def load_http_cache(groups: list[str], schedules_cache: dict) -> dict:
+    """Load HTTP validators, dropping those without matching cached schedules"""
+    try:
+        with open(HTTP_CACHE_FILE, "r") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+    
+    # Validators are only usable if the cached schedules were built
+    # from the same response for the same groups
+    http_cache = {"groups": groups, "github": {}, "yasno": {}}
+    if (data.get("groups") == groups and
+            data.get("schedules_hash") == cache_fingerprint(schedules_cache)):
+        for source in ("github", "yasno"):
+            if schedules_cache.get(source):
+                http_cache[source] = data.get(source, {})
+    
+    return http_cache
+
+
+def save_http_cache(http_cache: dict, schedules_cache: dict):
+    """Save HTTP validators to file, bound to the schedules they describe"""
+    http_cache["schedules_hash"] = cache_fingerprint(schedules_cache)
+    write_json_atomic(HTTP_CACHE_FILE, http_cache, indent=2)
 
 
 def schedules_changed(new_cache: dict, old_cache: dict) -> bool:
@@ -334,17 +447,36 @@ def schedules_changed(new_cache: dict, old_cache: dict) -> bool:
     return new_cache != old_cache
 
 
+def changed_entries(new_cache: dict, old_cache: dict) -> list[str]:
+    """List source / group / date entries that differ between caches"""
+    changed = []
+    
+    for source in ("github", "yasno"):
+        new_groups = new_cache.get(source, {})
+        old_groups = old_cache.get(source, {})
+        
+        for group in sorted(new_groups.keys() | old_groups.keys()):
+            new_dates = new_groups.get(group, {})
+            old_dates = old_groups.get(group, {})
+            
+            for date_str in sorted(new_dates.keys() | old_dates.keys()):
+                if new_dates.get(date_str) != old_dates.get(date_str):
+                    changed.append(f"{source} / {group} / {date_str}")
+    
+    return changed
+
+
 # === Message formatting ===
 
 def format_schedule_message(
-    periods: list[dict],
+    periods: list[dict[str, Any]],
     date: datetime,
     sources: list[str],
     special_status: Optional[str] = None
 ) -> str:
     """Format schedule message for one day"""
     day_name = DAYS_UA[date.weekday()]
-    date_str = date.strftime("%d.%m")
+    date_str = f"{date.day:02d}.{date.month:02d}"
     sources_str = ", ".join(sources)
     
     lines = [f"📆  {date_str} ({day_name}) [{sources_str}]:"]
@@ -358,24 +490,20 @@ def format_schedule_message(
         lines.append("⏳ Очікується інформація про графік")
         return "\n".join(lines)
     
-    total_on = 0.0
-    total_off = 0.0
+    # Slot counts indexed by is_on: [off, on]
+    totals: list[int] = [0, 0]
     
     for period in periods:
-        emoji = "🟢" if period["is_on"] else "🟠"
-        time_range = f"<code>{period['start']} - {period['end']}</code>"
-        hours_text = format_hours(period["hours"])
-        
-        lines.append(f"{emoji} {time_range} … ({hours_text})")
-        
-        if period["is_on"]:
-            total_on += period["hours"]
-        else:
-            total_off += period["hours"]
+        is_on = period["is_on"]
+        lines.append(
+            f"{PERIOD_EMOJI[is_on]} <code>{period['start']} - {period['end']}</code>"
+            f" … ({HOURS_STR[period['slot_count']]})"
+        )
+        totals[is_on] += period["slot_count"]
     
     lines.append("")
-    lines.append(f"🟢 Світло має бути за графіком: {format_hours(total_on)}")
-    lines.append(f"🟠 Світла не буде за графіком: {format_hours(total_off)}")
+    lines.append(f"🟢 Світло має бути за графіком: {HOURS_STR[totals[True]]}")
+    lines.append(f"🟠 Світла не буде за графіком: {HOURS_STR[totals[False]]}")
     
     return "\n".join(lines)
 
@@ -405,7 +533,7 @@ def format_group_message(
     yasno_schedules: dict
 ) -> Optional[str]:
     """Format message for one group - always show both sources if they differ"""
-    group_num = group.replace("GPV", "")
+    group_num = group.removeprefix("GPV")
     header = f"============ ◉ <b>{group_num}</b> ◉ ============"
     
     # Collect all dates from both sources
@@ -455,8 +583,9 @@ def format_group_message(
         if both_normal and schedules_match(github_slots, yasno_slots):
             # Data matches exactly - show single combined block
             periods = slots_to_periods(github_slots)
-            msg = format_schedule_message(periods, date, [SOURCE_GITHUB, SOURCE_YASNO])
-            source_messages.append(msg)
+            source_messages.append(
+                format_schedule_message(periods, date, [SOURCE_GITHUB, SOURCE_YASNO])
+            )
         else:
             # Data differs or special status - show both sources separately
             
@@ -521,8 +650,7 @@ def load_message_ids() -> list[int]:
 
 def save_message_ids(ids: list[int]):
     """Save message IDs to file"""
-    with open(MESSAGES_FILE, "w") as f:
-        json.dump(ids, f)
+    write_json_atomic(MESSAGES_FILE, ids)
 
 
 # === Telegram API ===
@@ -538,11 +666,12 @@ def send_telegram_message(message: str) -> Optional[int]:
     payload = {
         "chat_id": TELEGRAM_CHANNEL_ID,
         "text": message,
+        # Messages use <b>/<code> markup, so HTML parsing is required
         "parse_mode": "HTML"
     }
     
     try:
-        response = requests.post(url, json=payload, timeout=30)
+        response = SESSION.post(url, json=payload, timeout=30)
         response.raise_for_status()
         result = response.json()
         message_id = result.get("result", {}).get("message_id")
@@ -567,7 +696,7 @@ def pin_message(message_id: int) -> bool:
     }
     
     try:
-        response = requests.post(url, json=payload, timeout=30)
+        response = SESSION.post(url, json=payload, timeout=30)
         response.raise_for_status()
         print(f"Message {message_id} pinned")
         return True
@@ -589,7 +718,7 @@ def delete_message(message_id: int) -> bool:
     }
     
     try:
-        response = requests.post(url, json=payload, timeout=30)
+        response = SESSION.post(url, json=payload, timeout=30)
         response.raise_for_status()
         print(f"Message {message_id} deleted")
         return True
@@ -626,22 +755,40 @@ def main():
     print(f"Groups: {', '.join(groups)}")
     print(f"Kyiv time: {get_kyiv_now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Always fetch from both sources
-    print("\nFetching GitHub data...")
-    github_data = fetch_github_data(region)
-    print(f"GitHub data: {'OK' if github_data else 'FAILED'}")
+    old_cache = load_cached_schedules()
+    http_cache = load_http_cache(groups, old_cache)
+    
+    # Always fetch from both sources (concurrently)
+    print("\nFetching GitHub and Yasno API data...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        github_future = executor.submit(fetch_github_data, region, http_cache["github"])
+        yasno_future = executor.submit(
+            fetch_yasno_data, yasno_region_id, yasno_dso_id, http_cache["yasno"]
+        )
+        github_data = github_future.result()
+        yasno_data = yasno_future.result()
     
-    print("Fetching Yasno API data...")
-    yasno_data = fetch_yasno_data(yasno_region_id, yasno_dso_id)
-    print(f"Yasno data: {'OK' if yasno_data else 'FAILED'}")
+    print(f"GitHub data: {fetch_status(github_data)}")
+    print(f"Yasno data: {fetch_status(yasno_data)}")
     
     if not github_data and not yasno_data:
         print("Failed to fetch data from both sources")
         return
     
+    if github_data is NOT_MODIFIED and yasno_data is NOT_MODIFIED:
+        print("\nNo changes detected in sources")
+        return
+    
     # Extract schedules
-    github_schedules = extract_github_schedules(github_data, groups) if github_data else {}
-    yasno_schedules = extract_yasno_schedules(yasno_data, groups) if yasno_data else {}
+    if github_data is NOT_MODIFIED:
+        github_schedules = schedules_from_cache(old_cache["github"])
+    else:
+        github_schedules = extract_github_schedules(github_data, groups) if github_data else {}
+    
+    if yasno_data is NOT_MODIFIED:
+        yasno_schedules = schedules_from_cache(old_cache["yasno"])
+    else:
+        yasno_schedules = extract_yasno_schedules(yasno_data, groups) if yasno_data else {}
     
     print(f"\nGitHub schedules: {list(github_schedules.keys())}")
     for group, dates in github_schedules.items():
@@ -655,13 +802,15 @@ def main():
     
     # Convert to cache format and compare
     new_cache = schedules_to_cache_format(github_schedules, yasno_schedules)
-    old_cache = load_cached_schedules()
     
     if not schedules_changed(new_cache, old_cache):
         print("\nNo changes detected in schedules")
+        save_http_cache(http_cache, new_cache)
         return
     
     print("\nSchedule changes detected!")
+    for entry in changed_entries(new_cache, old_cache):
+        print(f"  changed: {entry}")
     
     # Format message
     message = format_full_message(github_schedules, yasno_schedules, groups)
@@ -681,6 +830,7 @@ def main():
     if message_id:
         manage_messages(message_id)
         save_cached_schedules(new_cache)
+        save_http_cache(http_cache, new_cache)
         print("Cache saved")
     else:
         print("Failed to send message, cache not updated")